@@ -1,12 +1,23 @@
 """Setup script for bedrock-agent-chat."""
 
+import os
+
 from setuptools import find_packages, setup
 
+# Optionally compile the event-stream drain loop with mypyc (see `make build-mypyc`).
+# The pure Python module is used whenever no compiled extension is present.
+ext_modules = []
+if os.environ.get("BEDROCK_AGENT_CHAT_MYPYC") == "1":
+    from mypyc.build import mypycify
+
+    ext_modules = mypycify(["--no-warn-unused-configs", "src/_event_stream.py"])
+
 setup(
     name="bedrock-agent-chat",
     version="0.1.0",
     packages=find_packages(where="src"),
     package_dir={"": "src"},
+    ext_modules=ext_modules,
     python_requires=">=3.9",
     install_requires=[
         "boto3>=1.28.0",
@@ -22,5 +33,11 @@ setup(
             "mypy>=1.5.0",
             "boto3-stubs[bedrock-agent-runtime]>=1.28.0",
         ],
+        "speedups": [
+            "orjson>=3.9.0",
+        ],
+        "msgpack": [
+            "msgpack>=1.0.0",
+        ],
     },
 )
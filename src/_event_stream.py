@@ -0,0 +1,46 @@
+"""Event-stream draining for Bedrock agent responses.
+
+This module is kept free of third-party imports so it can be compiled with
+mypyc; the pure Python version is used whenever no compiled build is present.
+"""
+
+from collections.abc import Iterable
+from typing import Any
+
+
+def drain_event_stream(
+    event_stream: Iterable[dict[str, Any]],
+    enable_trace: bool,
+) -> tuple[bytearray, list[dict[str, Any]]]:
+    """Collect the response bytes and trace events from an InvokeAgent stream.
+
+    The loop is specialized on enable_trace so the common path probes one key
+    per event.
+
+    Args:
+        event_stream: The completion event stream
+        enable_trace: Whether to collect trace events
+
+    Returns:
+        Tuple of (raw response bytes, trace events)
+    """
+    buf = bytearray()
+    trace_data: list[dict[str, Any]] = []
+    if enable_trace:
+        for event in event_stream:
+            chunk = event.get("chunk")
+            if chunk is not None:
+                data = chunk.get("bytes")
+                if data is not None:
+                    buf.extend(data)
+            trace = event.get("trace")
+            if trace is not None:
+                trace_data.append(trace)
+    else:
+        for event in event_stream:
+            chunk = event.get("chunk")
+            if chunk is not None:
+                data = chunk.get("bytes")
+                if data is not None:
+                    buf.extend(data)
+    return buf, trace_data
@@ -1,11 +1,100 @@
 """Client for interacting with AWS Bedrock Agent Runtime."""
 
-import uuid
+import asyncio
+import codecs
+import functools
+import os
+from collections.abc import Iterable, Iterator
 from typing import Any, Optional
 
-import boto3
 from botocore.exceptions import ClientError
 
+from ._event_stream import drain_event_stream
+
+_urandom = os.urandom
+_IncUtf8 = codecs.getincrementaldecoder("utf-8")
+
+
+def new_session_id() -> str:
+    """Generate a random session ID in UUID4 form.
+
+    Returns:
+        A hyphenated, version 4 UUID string
+    """
+    h = _urandom(16).hex()
+    variant = "89ab"[int(h[16], 16) & 3]
+    return f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{variant}{h[17:20]}-{h[20:]}"
+
+
+@functools.lru_cache(maxsize=8)
+def _get_client(
+    region_name: str,
+    aws_access_key_id: Optional[str],
+    aws_secret_access_key: Optional[str],
+    aws_session_token: Optional[str],
+    max_pool_connections: int,
+) -> Any:
+    """Get the shared bedrock-agent-runtime client for a region and credential set.
+
+    boto3 clients are thread-safe and building one is expensive, so a single
+    client is reused by every BedrockAgentClient with the same settings. The
+    cache is bounded so rotated temporary credentials do not pile up clients
+    and secrets for the life of the process. boto3 itself is imported here
+    rather than at module import to keep startup fast.
+
+    Args:
+        region_name: AWS region name
+        aws_access_key_id: Optional AWS access key ID
+        aws_secret_access_key: Optional AWS secret access key
+        aws_session_token: Optional AWS session token
+        max_pool_connections: Size of the HTTP connection pool
+
+    Returns:
+        A boto3 bedrock-agent-runtime client
+    """
+    import boto3
+    from botocore.config import Config
+
+    # Keep-alive connections and a pool large enough for concurrent
+    # invocations let repeated calls skip the TLS handshake.
+    client_kwargs: dict[str, Any] = {
+        "region_name": region_name,
+        "config": Config(
+            max_pool_connections=max_pool_connections,
+            tcp_keepalive=True,
+            retries={"mode": "adaptive", "max_attempts": 5},
+            connect_timeout=5,
+            read_timeout=300,
+        ),
+    }
+    if aws_access_key_id and aws_secret_access_key:
+        client_kwargs["aws_access_key_id"] = aws_access_key_id
+        client_kwargs["aws_secret_access_key"] = aws_secret_access_key
+        if aws_session_token:
+            client_kwargs["aws_session_token"] = aws_session_token
+
+    return boto3.client("bedrock-agent-runtime", **client_kwargs)
+
+
+def _invoke_error(error: ClientError) -> ClientError:
+    """Wrap an InvokeAgent failure with a clearer error message.
+
+    Args:
+        error: The original ClientError
+
+    Returns:
+        A new ClientError carrying the original error code
+    """
+    return ClientError(
+        {
+            "Error": {
+                "Code": error.response["Error"]["Code"],
+                "Message": f"Failed to invoke agent: {error.response['Error']['Message']}",
+            }
+        },
+        "invoke_agent",
+    )
+
 
 class BedrockAgentClient:
     """Client to invoke AWS Bedrock agents and manage chat sessions."""
@@ -19,6 +108,7 @@ class BedrockAgentClient:
         aws_access_key_id: Optional[str] = None,
         aws_secret_access_key: Optional[str] = None,
         aws_session_token: Optional[str] = None,
+        max_pool_connections: int = 50,
     ) -> None:
         """Initialize the Bedrock Agent client.
 
@@ -30,27 +120,28 @@ class BedrockAgentClient:
             aws_access_key_id: Optional AWS access key ID (overrides default credentials)
             aws_secret_access_key: Optional AWS secret access key (overrides default)
             aws_session_token: Optional AWS session token for temporary credentials
+            max_pool_connections: Size of the HTTP connection pool shared by
+                concurrent invocations
         """
         self.agent_id = agent_id
         self.agent_alias_id = agent_alias_id
         self.region_name = region_name
-        self.session_id = session_id or str(uuid.uuid4())
-
-        # Build client kwargs
-        client_kwargs = {"region_name": region_name}
-        if aws_access_key_id and aws_secret_access_key:
-            client_kwargs["aws_access_key_id"] = aws_access_key_id
-            client_kwargs["aws_secret_access_key"] = aws_secret_access_key
-            if aws_session_token:
-                client_kwargs["aws_session_token"] = aws_session_token
+        self.session_id = session_id or new_session_id()
 
-        self.client = boto3.client("bedrock-agent-runtime", **client_kwargs)  # type: ignore[call-overload]
+        self.client = _get_client(
+            region_name,
+            aws_access_key_id,
+            aws_secret_access_key,
+            aws_session_token,
+            max_pool_connections,
+        )
 
     def invoke_agent(
         self,
         prompt: str,
         enable_trace: bool = False,
         end_session: bool = False,
+        session_id: Optional[str] = None,
     ) -> dict[str, Any]:
         """Invoke the Bedrock agent with a prompt.
 
@@ -58,6 +149,7 @@ class BedrockAgentClient:
             prompt: The user's input text
             enable_trace: Whether to enable trace for debugging
             end_session: Whether to end the session after this invocation
+            session_id: Optional session ID to use instead of the current session
 
         Returns:
             Dictionary containing the response and metadata
@@ -65,49 +157,133 @@ class BedrockAgentClient:
         Raises:
             ClientError: If the AWS API call fails
         """
+        session_id = session_id or self.session_id
         try:
-            response = self.client.invoke_agent(
-                agentId=self.agent_id,
-                agentAliasId=self.agent_alias_id,
-                sessionId=self.session_id,
-                inputText=prompt,
-                enableTrace=enable_trace,
-                endSession=end_session,
-            )
+            event_stream = self._open_event_stream(prompt, enable_trace, end_session, session_id)
 
-            # Process the event stream
-            completion = ""
-            trace_data = []
-
-            event_stream = response.get("completion", [])
-            for event in event_stream:
-                if "chunk" in event:
-                    chunk = event["chunk"]
-                    if "bytes" in chunk:
-                        completion += chunk["bytes"].decode("utf-8")
-
-                if enable_trace and "trace" in event:
-                    trace_data.append(event["trace"])
+            # Collect raw bytes and decode once at the end
+            data, trace_data = drain_event_stream(event_stream, enable_trace)
 
         except ClientError as e:
-            error_code = e.response["Error"]["Code"]
-            error_message = e.response["Error"]["Message"]
-            raise ClientError(
-                {
-                    "Error": {
-                        "Code": error_code,
-                        "Message": f"Failed to invoke agent: {error_message}",
-                    }
-                },
-                "invoke_agent",
-            ) from e
+            raise _invoke_error(e) from e
         else:
             return {
-                "completion": completion,
-                "session_id": self.session_id,
+                "completion": data.decode("utf-8"),
+                "session_id": session_id,
                 "trace": trace_data if enable_trace else None,
             }
 
+    def iter_invoke_agent(
+        self,
+        prompt: str,
+        enable_trace: bool = False,
+        end_session: bool = False,
+        trace_data: Optional[list[dict[str, Any]]] = None,
+    ) -> Iterator[str]:
+        """Invoke the Bedrock agent and yield the response as it streams in.
+
+        Args:
+            prompt: The user's input text
+            enable_trace: Whether to enable trace for debugging
+            end_session: Whether to end the session after this invocation
+            trace_data: Optional list that trace events are appended to when
+                enable_trace is set
+
+        Yields:
+            Decoded response text chunks, in arrival order
+
+        Raises:
+            ClientError: If the AWS API call fails
+        """
+        try:
+            event_stream = self._open_event_stream(
+                prompt,
+                enable_trace,
+                end_session,
+                self.session_id,
+            )
+            # One incremental decoder keeps multi-byte characters that are
+            # split across chunks intact
+            decoder = _IncUtf8()
+            for event in event_stream:
+                chunk = event.get("chunk")
+                if chunk is not None:
+                    data = chunk.get("bytes")
+                    if data:
+                        piece = decoder.decode(data)
+                        if piece:
+                            yield piece
+
+                if enable_trace and trace_data is not None and "trace" in event:
+                    trace_data.append(event["trace"])
+
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
+
+        except ClientError as e:
+            raise _invoke_error(e) from e
+
+    def _open_event_stream(
+        self,
+        prompt: str,
+        enable_trace: bool,
+        end_session: bool,
+        session_id: str,
+    ) -> Iterable[dict[str, Any]]:
+        """Call InvokeAgent and return the completion event stream.
+
+        Args:
+            prompt: The user's input text
+            enable_trace: Whether to enable trace for debugging
+            end_session: Whether to end the session after this invocation
+            session_id: The session ID to invoke the agent in
+
+        Returns:
+            The completion event stream
+        """
+        response = self.client.invoke_agent(
+            agentId=self.agent_id,
+            agentAliasId=self.agent_alias_id,
+            sessionId=session_id,
+            inputText=prompt,
+            enableTrace=enable_trace,
+            endSession=end_session,
+        )
+        return response.get("completion", [])
+
+    async def ainvoke_agent(
+        self,
+        prompt: str,
+        enable_trace: bool = False,
+        end_session: bool = False,
+        session_id: Optional[str] = None,
+    ) -> dict[str, Any]:
+        """Invoke the Bedrock agent without blocking the event loop.
+
+        The boto3 call and the event stream it returns are both synchronous,
+        so the whole invocation runs in a worker thread.
+
+        Args:
+            prompt: The user's input text
+            enable_trace: Whether to enable trace for debugging
+            end_session: Whether to end the session after this invocation
+            session_id: Optional session ID to use instead of the current session
+
+        Returns:
+            Dictionary containing the response and metadata
+
+        Raises:
+            ClientError: If the AWS API call fails
+        """
+        return await asyncio.to_thread(
+            self.invoke_agent,
+            prompt,
+            enable_trace,
+            end_session,
+            session_id,
+        )
+
     def get_session_id(self) -> str:
         """Get the current session ID.
 
@@ -122,5 +298,5 @@ class BedrockAgentClient:
         Returns:
             The new session ID
         """
-        self.session_id = str(uuid.uuid4())
+        self.session_id = new_session_id()
         return self.session_id
@@ -1,18 +1,30 @@
 """Simple chat application for AWS Bedrock agents."""
 
+import asyncio
+import functools
 import os
+import queue
+import re
 import sys
-from typing import Optional
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Union
 
 from dotenv import load_dotenv
 
-from .bedrock_agent_client import BedrockAgentClient
+from .bedrock_agent_client import BedrockAgentClient, new_session_id
 from .chat_history_logger import ChatHistoryLogger
 
+_ARN_RE = re.compile(r"arn:aws[a-z-]*:bedrock:([a-z0-9-]+):\d+:agent/([0-9a-zA-Z]+)")
 
+
+@functools.lru_cache(maxsize=32)
 def parse_agent_arn(arn: str) -> tuple[str, str]:
     """Parse agent ID and region from ARN.
 
+    Results are cached, so repeated lookups of the same ARN skip the regex.
+
     Args:
         arn: The Bedrock agent ARN
 
@@ -22,15 +34,53 @@ def parse_agent_arn(arn: str) -> tuple[str, str]:
     Raises:
         ValueError: If ARN format is invalid
     """
-    try:
-        parts = arn.split(":")
-        if len(parts) < 6 or parts[2] != "bedrock":
-            raise ValueError("Invalid Bedrock agent ARN format")
-        region = parts[3]
-        agent_id = parts[5].split("/")[-1]
-        return agent_id, region
-    except (IndexError, AttributeError) as e:
-        raise ValueError(f"Invalid ARN format: {arn}") from e
+    match = _ARN_RE.fullmatch(arn)
+    if not match:
+        raise ValueError(f"Invalid ARN format: {arn}")
+    return match.group(2), match.group(1)
+
+
+_QUIT_COMMANDS = ("quit", "exit")
+
+# What the input reader hands the chat loop: a line, the error that stopped
+# it, or None at end of input
+_InputItem = Union[str, Exception, None]
+
+
+def _start_input_reader(put: Callable[[_InputItem], object]) -> threading.Thread:
+    """Read stdin lines on a daemon thread and hand them to the chat loop.
+
+    Reading ahead lets the user compose the next message while the agent is
+    still responding. The thread stops after a quit command, end of input or
+    an error reading stdin, and as a daemon it never holds up interpreter
+    shutdown. Its last item is always None, or the read error when there was
+    one, so the chat loop never waits on a dead reader.
+
+    Args:
+        put: Callback receiving each stripped line, then the read error or None
+
+    Returns:
+        The started reader thread
+    """
+
+    def reader() -> None:
+        last: _InputItem = None
+        try:
+            while True:
+                line = input().strip()
+                put(line)
+                if line.lower() in _QUIT_COMMANDS:
+                    return
+        except EOFError:
+            pass
+        except Exception as e:
+            last = e
+        finally:
+            put(last)
+
+    thread = threading.Thread(target=reader, name="chat-input", daemon=True)
+    thread.start()
+    return thread
 
 
 class ChatApp:
@@ -65,50 +115,66 @@ class ChatApp:
             aws_secret_access_key=aws_secret_access_key,
             aws_session_token=aws_session_token,
         )
+        self.log_dir = log_dir
         self.logger = ChatHistoryLogger(log_dir, self.client.get_session_id())
         self.running = False
+        self._welcome_banner = self._build_welcome_banner()
 
     def display_welcome(self) -> None:
         """Display welcome message and instructions."""
-        print("\n" + "=" * 70)
-        print("AWS Bedrock Agent Chat")
-        print("=" * 70)
-        print(f"Session ID: {self.client.get_session_id()}")
-        print(f"Log file: {self.logger.get_log_path()}")
-        print("\nCommands:")
-        print("  - Type your message and press Enter to chat")
-        print("  - Type 'quit' or 'exit' to end the session")
-        print("  - Type 'new' to start a new session")
-        print("  - Type 'history' to view chat history")
-        print("=" * 70 + "\n")
+        print(self._welcome_banner)
+
+    def _build_welcome_banner(self) -> str:
+        """Build the welcome banner for the current session.
+
+        Returns:
+            The formatted banner text
+        """
+        rule = "=" * 70
+        return "\n".join(
+            (
+                "\n" + rule,
+                "AWS Bedrock Agent Chat",
+                rule,
+                f"Session ID: {self.client.get_session_id()}",
+                f"Log file: {self.logger.get_log_path()}",
+                "\nCommands:",
+                "  - Type your message and press Enter to chat",
+                "  - Type 'quit' or 'exit' to end the session",
+                "  - Type 'new' to start a new session",
+                "  - Type 'history' to view chat history",
+                rule + "\n",
+            )
+        )
 
     def display_history(self) -> None:
         """Display the chat history."""
-        history = self.logger.read_history()
-        if not history:
+        rule = "-" * 70
+        parts = ["\n" + rule, "Chat History", rule]
+        header_len = len(parts)
+        append = parts.append
+        for entry in self.logger.iter_history():
+            append(f"[{entry['timestamp']}] {entry['role'].upper()}:\n  {entry['content']}\n")
+
+        if len(parts) == header_len:
             print("\nNo chat history available.\n")
             return
 
-        print("\n" + "-" * 70)
-        print("Chat History")
-        print("-" * 70)
-        for entry in history:
-            role = entry["role"].upper()
-            content = entry["content"]
-            timestamp = entry["timestamp"]
-            print(f"[{timestamp}] {role}:")
-            print(f"  {content}\n")
-        print("-" * 70 + "\n")
+        append(rule + "\n")
+        # One write for the whole listing instead of several per entry
+        sys.stdout.write("\n".join(parts) + "\n")
 
     def new_session(self) -> None:
         """Start a new chat session."""
         session_id = self.client.new_session()
-        self.logger = ChatHistoryLogger("./logs", session_id)
+        self.logger.close()
+        self.logger = ChatHistoryLogger(self.log_dir, session_id)
+        self._welcome_banner = self._build_welcome_banner()
         print(f"\n✓ Started new session: {session_id}")
         print(f"✓ New log file: {self.logger.get_log_path()}\n")
 
     def process_message(self, user_input: str) -> Optional[str]:
-        """Process user input and get agent response.
+        """Process user input and stream the agent response to stdout.
 
         Args:
             user_input: The user's message
@@ -118,14 +184,22 @@ class ChatApp:
         """
         try:
             print("\n🤖 Agent is thinking...\n")
-            response = self.client.invoke_agent(user_input)
-            agent_response = response["completion"]
+            pieces: list[str] = []
+            for piece in self.client.iter_invoke_agent(user_input):
+                if not pieces:
+                    sys.stdout.write("Agent: ")
+                pieces.append(piece)
+                sys.stdout.write(piece)
+                sys.stdout.flush()
+            if pieces:
+                sys.stdout.write("\n\n")
+            agent_response = "".join(pieces)
 
             # Log the exchange
             self.logger.log_exchange(
                 user_input,
                 agent_response,
-                {"session_id": response["session_id"]},
+                {"session_id": self.client.get_session_id()},
             )
 
             return agent_response
@@ -134,44 +208,171 @@ class ChatApp:
             print(f"\n❌ Error: {e}\n")
             return None
 
+    async def aprocess_message(self, user_input: str) -> Optional[str]:
+        """Process user input without blocking the event loop.
+
+        The agent call runs on its own daemon thread rather than the loop's
+        default executor, which asyncio.run waits for on shutdown; Ctrl-C
+        therefore exits immediately instead of after the call returns.
+
+        Args:
+            user_input: The user's message
+
+        Returns:
+            The agent's response, or None if an error occurred
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[Optional[str]] = loop.create_future()
+
+        def settle(result: Optional[str], error: Optional[BaseException]) -> None:
+            if future.done():
+                return
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+        def worker() -> None:
+            result, error = None, None
+            try:
+                result = self.process_message(user_input)
+            except Exception as e:
+                error = e
+            try:
+                loop.call_soon_threadsafe(settle, result, error)
+            except RuntimeError:
+                pass  # The loop already closed after an interrupt
+
+        threading.Thread(target=worker, name="chat-agent-call", daemon=True).start()
+        return await future
+
+    def run_batch(self, prompts: list[str], max_workers: int = 8) -> list[Optional[str]]:
+        """Send independent prompts to the agent concurrently.
+
+        Each prompt runs in its own agent session over the shared client, and
+        exchanges are logged as they complete.
+
+        Args:
+            prompts: The user messages to send
+            max_workers: Maximum number of concurrent agent invocations
+
+        Returns:
+            The agent responses in prompt order, with None for failed prompts
+        """
+        results: list[Optional[str]] = [None] * len(prompts)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(
+                    self.client.invoke_agent,
+                    prompt,
+                    session_id=new_session_id(),
+                ): index
+                for index, prompt in enumerate(prompts)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    response = future.result()
+                except Exception as e:
+                    print(f"\n❌ Error: {e}\n")
+                    continue
+
+                results[index] = response["completion"]
+                self.logger.log_exchange(
+                    prompts[index],
+                    response["completion"],
+                    {"session_id": response["session_id"]},
+                )
+
+        return results
+
+    def handle_command(self, user_input: str) -> bool:
+        """Handle a chat command, if the input is one.
+
+        Args:
+            user_input: The stripped user input
+
+        Returns:
+            True if the input was a command and has been handled
+        """
+        cmd = user_input.lower()
+        if cmd in _QUIT_COMMANDS:
+            print("\n👋 Goodbye! Chat history saved.\n")
+            self.running = False
+            return True
+
+        if cmd == "new":
+            self.new_session()
+            return True
+
+        if cmd == "history":
+            self.display_history()
+            return True
+
+        return False
+
     def run(self) -> None:
         """Run the interactive chat loop."""
         self.display_welcome()
         self.running = True
 
+        lines: queue.Queue[_InputItem] = queue.Queue()
+        _start_input_reader(lines.put)
+
         while self.running:
             try:
-                user_input = input("You: ").strip()
-
-                if not user_input:
-                    continue
-
-                # Handle commands
-                if user_input.lower() in ("quit", "exit"):
-                    print("\n👋 Goodbye! Chat history saved.\n")
+                # Only prompt when nothing was typed ahead; otherwise echo the
+                # queued line so the transcript shows what is being handled
+                pending = not lines.empty()
+                if not pending:
+                    print("You: ", end="", flush=True)
+                user_input = lines.get()
+                if isinstance(user_input, Exception):
+                    raise user_input
+                if user_input is None:
                     self.running = False
                     break
+                if pending and user_input:
+                    print(f"You (queued): {user_input}")
 
-                if user_input.lower() == "new":
-                    self.new_session()
-                    continue
-
-                if user_input.lower() == "history":
-                    self.display_history()
+                if not user_input or self.handle_command(user_input):
                     continue
 
                 # Process regular message
-                agent_response = self.process_message(user_input)
-                if agent_response:
-                    print(f"Agent: {agent_response}\n")
+                self.process_message(user_input)
 
             except KeyboardInterrupt:
                 print("\n\n👋 Goodbye! Chat history saved.\n")
                 self.running = False
                 break
-            except EOFError:
+
+    async def arun(self) -> None:
+        """Run the interactive chat loop on the asyncio event loop."""
+        self.display_welcome()
+        self.running = True
+
+        loop = asyncio.get_running_loop()
+        lines: asyncio.Queue[_InputItem] = asyncio.Queue()
+        _start_input_reader(lambda line: loop.call_soon_threadsafe(lines.put_nowait, line))
+
+        while self.running:
+            pending = not lines.empty()
+            if not pending:
+                print("You: ", end="", flush=True)
+            user_input = await lines.get()
+            if isinstance(user_input, Exception):
+                raise user_input
+            if user_input is None:
                 self.running = False
                 break
+            if pending and user_input:
+                print(f"You (queued): {user_input}")
+
+            if not user_input or self.handle_command(user_input):
+                continue
+
+            # Process regular message
+            await self.aprocess_message(user_input)
 
 
 def main() -> None:
@@ -214,7 +415,12 @@ def main() -> None:
         aws_secret_access_key=aws_secret_access_key,
         aws_session_token=aws_session_token,
     )
-    app.run()
+    try:
+        asyncio.run(app.arun())
+    except KeyboardInterrupt:
+        print("\n\n👋 Goodbye! Chat history saved.\n")
+    finally:
+        app.logger.close()
 
 
 if __name__ == "__main__":
@@ -1,27 +1,394 @@
 """Chat history logging functionality."""
 
+import functools
 import json
-from datetime import datetime, timezone
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+import weakref
+from collections.abc import Iterable, Iterator
 from pathlib import Path
-from typing import Any, Optional
+from types import TracebackType
+from typing import IO, Any, Optional, Union
+
+# orjson is used for reading as well as writing when available: it parses
+# even single-record history tails several times faster than json.loads.
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> bytes:
+        # Accept the same non-str dict keys json.dumps does
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    def _loads(data: bytes) -> Any:
+        return orjson.loads(data)
+
+    def _quote(s: str) -> bytes:
+        return orjson.dumps(s)
+
+except ImportError:  # pragma: no cover - exercised only without orjson installed
+    from json.encoder import encode_basestring
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def _loads(data: bytes) -> Any:
+        return json.loads(data)
+
+    def _quote(s: str) -> bytes:
+        # The C string escaper, without json.dumps' encoder setup per call
+        return encode_basestring(s).encode("utf-8")
+
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - exercised only without msgpack installed
+    msgpack = None
+
+# Little-endian length prefix in front of every MessagePack record
+_RECORD_HEADER = struct.Struct("<I")
+
+# File extension used for each supported log format
+_LOG_EXTENSIONS = {"jsonl": ".log", "msgpack": ".mpk"}
+
+# Unread JSONL tails larger than this are memory-mapped instead of read
+_MMAP_THRESHOLD = 1 << 20
+
+# Most encoded records the writer thread may have queued before callers block
+_QUEUE_SIZE = 1024
+
+
+@functools.lru_cache(maxsize=64)
+def _role_fragment(role: str) -> bytes:
+    """Get the constant JSON fragment between the timestamp and content values.
+
+    Args:
+        role: The role of the message sender
+
+    Returns:
+        The encoded role key/value followed by the content key
+    """
+    return b',"role":' + _dumps(role) + b',"content":'
+
+
+def _encode_json_metadata(metadata: Optional[dict[str, Any]]) -> bytes:
+    """Encode the metadata member of a JSON log line.
+
+    Args:
+        metadata: Optional metadata to include with a message
+
+    Returns:
+        The encoded metadata key/value, or b"" when there is no metadata
+    """
+    if not metadata:
+        return b""
+    return b',"metadata":' + _dumps(metadata)
+
+
+def _encode_json_entry(role: str, content: str, timestamp: str, metadata: bytes) -> bytes:
+    """Encode one chat message as a JSON line.
+
+    The key skeleton is fixed, so only the values go through the encoder.
+    The timestamp is generated here and never needs escaping, so it is
+    spliced in without an encoder call.
+
+    Args:
+        role: The role of the message sender
+        content: The message content
+        timestamp: ISO 8601 timestamp for the entry
+        metadata: Metadata member from _encode_json_metadata
+
+    Returns:
+        The UTF-8 encoded JSON line, including its trailing newline
+    """
+    return b"".join(
+        (
+            b'{"timestamp":"',
+            timestamp.encode("ascii"),
+            b'"',
+            _role_fragment(role),
+            _quote(content),
+            metadata,
+            b"}\n",
+        )
+    )
+
+
+def _encode_msgpack_metadata(metadata: Optional[dict[str, Any]]) -> bytes:
+    """Encode the metadata key/value pair of a MessagePack log record.
+
+    Args:
+        metadata: Optional metadata to include with a message
+
+    Returns:
+        The packed metadata key and value, or b"" when there is no metadata
+    """
+    if not metadata:
+        return b""
+    return msgpack.packb("metadata") + msgpack.packb(metadata)
+
+
+def _encode_msgpack_entry(role: str, content: str, timestamp: str, metadata: bytes) -> bytes:
+    """Encode one chat message as a length-prefixed MessagePack record.
+
+    The map is assembled from individually packed keys and values so that a
+    pre-packed metadata pair can be spliced in.
+
+    Args:
+        role: The role of the message sender
+        content: The message content
+        timestamp: ISO 8601 timestamp for the entry
+        metadata: Metadata pair from _encode_msgpack_metadata
+
+    Returns:
+        The 4-byte little-endian length header followed by the packed entry
+    """
+    packb = msgpack.packb
+    packed = b"".join(
+        (
+            b"\x84" if metadata else b"\x83",  # fixmap header with 4 or 3 entries
+            packb("timestamp"),
+            packb(timestamp),
+            packb("role"),
+            packb(role),
+            packb("content"),
+            packb(content),
+            metadata,
+        )
+    )
+    return _RECORD_HEADER.pack(len(packed)) + packed
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    """Write all of data to a file descriptor.
+
+    Args:
+        fd: Descriptor opened for writing
+        data: Bytes to write
+    """
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+def _drain_writes(q: queue.Queue[Optional[bytes]], fd: int, errors: list[OSError]) -> None:
+    """Write queued records to the log file until the close sentinel arrives.
+
+    Runs on a logger's writer thread. Everything queued at the time of a
+    wake-up is written with a single os.write call where the kernel allows it.
+
+    Args:
+        q: Queue of encoded records, terminated by None
+        fd: Log file descriptor opened for appending
+        errors: List that write failures are appended to for the logger
+    """
+    running = True
+    while running:
+        batch = [q.get()]
+        while True:
+            try:
+                batch.append(q.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            if batch[-1] is None:
+                running = False
+                batch.pop()
+            if batch:
+                _write_all(fd, b"".join(batch))  # type: ignore[arg-type]
+        except OSError as e:
+            errors.append(e)
+        finally:
+            for _ in range(len(batch) + (not running)):
+                q.task_done()
+
+
+def _stop_writer(q: queue.Queue[Optional[bytes]], worker: threading.Thread, fd: int) -> None:
+    """Let a writer thread finish the queued records, then close its file.
+
+    Args:
+        q: The writer's record queue
+        worker: The writer thread
+        fd: Log file descriptor to close once the writer has stopped
+    """
+    q.put(None)
+    worker.join()
+    os.close(fd)
+
+
+def _read_jsonl_tail(f: IO[bytes], offset: int) -> tuple[list[dict[str, Any]], int]:
+    """Parse complete JSON lines from a log file's tail offset.
+
+    All new lines are parsed with one decoder call on a synthesized JSON
+    array rather than one call per line.
+
+    Tails larger than 1 MiB are handed to _read_jsonl_mmap instead.
+
+    Args:
+        f: Log file opened in binary mode, positioned at the tail offset
+        offset: Byte offset just past the last entry already parsed
+
+    Returns:
+        Parsed entries and the offset just past the last complete line
+    """
+    if os.fstat(f.fileno()).st_size - offset > _MMAP_THRESHOLD:
+        return _read_jsonl_mmap(f, offset)
+    data = f.read()
+    # A trailing line without a newline is still being written; leave it
+    end = data.rfind(b"\n") + 1
+    lines = [line for line in data[:end].split(b"\n") if line.strip()]
+    if not lines:
+        return [], offset + end
+    return _loads(b"[" + b",".join(lines) + b"]"), offset + end
+
+
+def _read_jsonl_mmap(f: IO[bytes], offset: int) -> tuple[list[dict[str, Any]], int]:
+    """Parse complete JSON lines from a memory map of the log file.
+
+    Avoids copying a large tail into one heap buffer; pages are faulted in
+    as the lines are walked and each line is parsed on its own.
+
+    Args:
+        f: Log file opened in binary mode
+        offset: Byte offset just past the last entry already parsed
+
+    Returns:
+        Parsed entries and the offset just past the last complete line
+    """
+    entries = []
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = offset
+        while (end := mm.find(b"\n", pos)) != -1:
+            line = mm[pos:end]
+            if line.strip():
+                entries.append(_loads(line))
+            pos = end + 1
+    return entries, pos
+
+
+def _read_msgpack_tail(f: IO[bytes], offset: int) -> tuple[list[dict[str, Any]], int]:
+    """Parse complete MessagePack records from a log file's tail offset.
+
+    Args:
+        f: Log file opened in binary mode, positioned at the tail offset
+        offset: Byte offset just past the last record already parsed
+
+    Returns:
+        Parsed entries and the offset just past the last complete record
+    """
+    data = f.read()
+    header_size = _RECORD_HEADER.size
+    entries = []
+    pos = 0
+    while pos + header_size <= len(data):
+        (size,) = _RECORD_HEADER.unpack_from(data, pos)
+        end = pos + header_size + size
+        if end > len(data):
+            break  # Partially written record; pick it up next time
+        # Metadata may carry non-str keys, which MessagePack keeps as written
+        entries.append(msgpack.unpackb(data[pos + header_size : end], strict_map_key=False))
+        pos = end
+    return entries, offset + pos
 
 
 class ChatHistoryLogger:
     """Logger for chat conversations with the Bedrock agent."""
 
-    def __init__(self, log_dir: str = "./logs", session_id: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        log_dir: Union[str, Path] = "./logs",
+        session_id: Optional[str] = None,
+        log_format: str = "jsonl",
+    ) -> None:
         """Initialize the chat history logger.
 
         Args:
             log_dir: Directory to store chat history logs
             session_id: Optional session ID for the log file name
+            log_format: On-disk format, either 'jsonl' (JSON Lines, .log) or
+                'msgpack' (length-prefixed MessagePack records, .mpk)
+
+        Raises:
+            ValueError: If log_format is not supported
+            ImportError: If log_format is 'msgpack' and msgpack is not installed
         """
+        if log_format not in _LOG_EXTENSIONS:
+            raise ValueError(f"Unsupported log format: {log_format}")
+        if log_format == "msgpack" and msgpack is None:
+            raise ImportError("log_format='msgpack' requires the msgpack package")
+
+        self.log_format = log_format
+        if log_format == "msgpack":
+            self._encode_entry = _encode_msgpack_entry
+            self._encode_metadata = _encode_msgpack_metadata
+            self._read_tail = _read_msgpack_tail
+        else:
+            self._encode_entry = _encode_json_entry
+            self._encode_metadata = _encode_json_metadata
+            self._read_tail = _read_jsonl_tail
+
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(parents=True, exist_ok=True)
 
-        timestamp = datetime.now(tz=timezone.utc).strftime("%Y%m%d_%H%M%S")
-        session_suffix = f"_{session_id[:8]}" if session_id else ""
-        self.log_file = self.log_dir / f"chat_history_{timestamp}{session_suffix}.log"
+        session_suffix = "_" + session_id[:8] if session_id else ""
+        self.log_file = self.log_dir / "".join(
+            (
+                "chat_history_",
+                time.strftime("%Y%m%d_%H%M%S", time.gmtime()),
+                session_suffix,
+                _LOG_EXTENSIONS[log_format],
+            )
+        )
+
+        # Keep one append-only descriptor open for the logger's lifetime instead
+        # of reopening the file for every message. Only the writer thread
+        # touches it; callers hand it encoded records through the queue.
+        # O_APPEND makes each write land at the current end of file, so
+        # several loggers sharing a file never overwrite each other's records.
+        self._fd = os.open(self.log_file, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._queue: queue.Queue[Optional[bytes]] = queue.Queue(maxsize=_QUEUE_SIZE)
+        self._write_errors: list[OSError] = []
+        self._worker = threading.Thread(
+            target=_drain_writes,
+            args=(self._queue, self._fd, self._write_errors),
+            name="chat-history-writer",
+            daemon=True,
+        )
+        self._worker.start()
+        # Queued entries are written out and the file closed by close(), or
+        # when the logger is garbage collected or the interpreter exits
+        self._closed = False
+        self._finalizer = weakref.finalize(self, _stop_writer, self._queue, self._worker, self._fd)
+
+        # (epoch second, formatted date and time) for the most recent timestamp
+        self._ts_cache: tuple[int, str] = (-1, "")
+
+        # Entries parsed so far, the byte offset just past the last one and the
+        # (mtime_ns, size) of the file when it was last fully read, so repeated
+        # history reads skip unchanged files and only parse appended lines
+        self._history_cache: list[dict[str, Any]] = []
+        self._tail_offset = 0
+        self._stat_key: Optional[tuple[int, int]] = None
+
+    def __enter__(self) -> "ChatHistoryLogger":
+        """Enter the runtime context.
+
+        Returns:
+            This logger
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """Close the log file when leaving the runtime context."""
+        self.close()
 
     def log_message(
         self,
@@ -31,22 +398,22 @@ class ChatHistoryLogger:
     ) -> None:
         """Log a single message to the chat history.
 
+        The entry is handed to a background writer thread, so the call does
+        not wait for disk I/O unless the write queue is full; call flush() to
+        wait until it is on disk.
+
         Args:
             role: The role of the message sender (e.g., 'user', 'agent')
             content: The message content
             metadata: Optional metadata to include with the message
-        """
-        entry: dict[str, Any] = {
-            "timestamp": datetime.now(tz=timezone.utc).isoformat(),
-            "role": role,
-            "content": content,
-        }
-
-        if metadata:
-            entry["metadata"] = metadata
 
-        with self.log_file.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        Raises:
+            ValueError: If the logger has been closed
+        """
+        self._check_open()
+        self._queue.put(
+            self._encode_entry(role, content, self._timestamp(), self._encode_metadata(metadata))
+        )
 
     def log_exchange(
         self,
@@ -56,13 +423,82 @@ class ChatHistoryLogger:
     ) -> None:
         """Log a complete exchange between user and agent.
 
+        Both entries share one timestamp and are written to disk together.
+
         Args:
             user_message: The user's input message
             agent_response: The agent's response
             metadata: Optional metadata about the exchange
+
+        Raises:
+            ValueError: If the logger has been closed
+        """
+        self.log_messages((("user", user_message), ("agent", agent_response)), metadata)
+
+    def log_messages(
+        self,
+        messages: Iterable[tuple[str, str]],
+        metadata: Optional[dict[str, Any]] = None,
+    ) -> None:
+        """Log several messages as a single queued write.
+
+        All entries share one timestamp and reach the file together. The
+        metadata is encoded once and reused for every entry.
+
+        Args:
+            messages: (role, content) pairs in conversation order
+            metadata: Optional metadata to include with every message
+
+        Raises:
+            ValueError: If the logger has been closed
+        """
+        self._check_open()
+        timestamp = self._timestamp()
+        meta = self._encode_metadata(metadata)
+        encode_entry = self._encode_entry
+        self._queue.put(
+            b"".join(encode_entry(role, content, timestamp, meta) for role, content in messages)
+        )
+
+    def _timestamp(self) -> str:
+        """Get the current UTC time as an ISO 8601 string.
+
+        The date and time part is formatted at most once per second; only the
+        microseconds are formatted on every call.
+
+        Returns:
+            Timestamp such as '2024-11-13T12:00:00.123456+00:00'
+        """
+        seconds, nanoseconds = divmod(time.time_ns(), 1_000_000_000)
+        if seconds != self._ts_cache[0]:
+            self._ts_cache = (seconds, time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds)))
+        return f"{self._ts_cache[1]}.{nanoseconds // 1000:06d}+00:00"
+
+    def flush(self) -> None:
+        """Block until every queued log entry has been written to disk.
+
+        Raises:
+            OSError: If the writer thread failed to write an entry
         """
-        self.log_message("user", user_message, metadata)
-        self.log_message("agent", agent_response, metadata)
+        self._queue.join()
+        if self._write_errors:
+            error = self._write_errors[-1]
+            self._write_errors.clear()
+            raise error
+
+    def close(self) -> None:
+        """Write any queued entries, stop the writer thread and close the log file."""
+        self._closed = True
+        self._finalizer()
+
+    def _check_open(self) -> None:
+        """Reject writes once the logger is closed.
+
+        Raises:
+            ValueError: If close() has been called
+        """
+        if self._closed:
+            raise ValueError("write to closed log file")
 
     def get_log_path(self) -> Path:
         """Get the path to the current log file.
@@ -78,8 +514,44 @@ class ChatHistoryLogger:
         Returns:
             List of chat message dictionaries
         """
-        if not self.log_file.exists():
-            return []
+        return list(self.iter_history())
+
+    def iter_history(self) -> Iterator[dict[str, Any]]:
+        """Iterate over the chat history in the log file.
+
+        Entries parsed by earlier calls are served from memory before the file
+        is touched. The file is only opened when its modification time or size
+        has changed, and then only records appended since the last read are
+        parsed, in one batch.
+
+        Yields:
+            Chat message dictionaries, one per logged line
+        """
+        self.flush()
+
+        try:
+            st = self.log_file.stat()
+        except FileNotFoundError:
+            self._history_cache = []
+            self._tail_offset = 0
+            return
+
+        if st.st_size < self._tail_offset:
+            # The file was truncated or replaced; start over
+            self._history_cache = []
+            self._tail_offset = 0
+            self._stat_key = None
+
+        yield from self._history_cache[:]
+
+        stat_key = (st.st_mtime_ns, st.st_size)
+        if stat_key == self._stat_key:
+            return
+
+        with self.log_file.open("rb") as f:
+            f.seek(self._tail_offset)
+            new_entries, self._tail_offset = self._read_tail(f, self._tail_offset)
 
-        with self.log_file.open(encoding="utf-8") as f:
-            return [json.loads(line) for line in f if line.strip()]
+        self._history_cache.extend(new_entries)
+        self._stat_key = stat_key
+        yield from new_entries
@@ -0,0 +1,41 @@
+"""Shared pytest fixtures."""
+
+import os
+
+import pytest
+
+from src.bedrock_agent_client import BedrockAgentClient
+from src.chat_app import parse_agent_arn
+
+
+@pytest.fixture(scope="session")
+def agent_config() -> tuple[str, str, str]:
+    """Resolve the agent configuration from the environment once per session.
+
+    Returns:
+        Tuple of (agent_id, agent_alias_id, region)
+    """
+    agent_arn = os.getenv("BEDROCK_AGENT_ARN")
+    agent_id = os.getenv("BEDROCK_AGENT_ID")
+    agent_alias_id = os.getenv("BEDROCK_AGENT_ALIAS_ID", "TSTALIASID")
+    region = os.getenv("AWS_REGION", "us-west-2")
+
+    if agent_arn and not agent_id:
+        agent_id, region = parse_agent_arn(agent_arn)
+
+    if not agent_id:
+        pytest.skip("BEDROCK_AGENT_ID or BEDROCK_AGENT_ARN not configured")
+
+    return agent_id, agent_alias_id, region
+
+
+@pytest.fixture(scope="session")
+def bedrock_client(agent_config: tuple[str, str, str]) -> BedrockAgentClient:
+    """Create one agent client shared by all integration tests.
+
+    Tests that need a fresh conversation call new_session() first.
+
+    Returns:
+        Client for the configured agent
+    """
+    return BedrockAgentClient(*agent_config)
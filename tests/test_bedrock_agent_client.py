@@ -1,11 +1,20 @@
 """Unit tests for BedrockAgentClient."""
 
+import asyncio
+import uuid
 from unittest.mock import MagicMock, patch
 
 import pytest
 from botocore.exceptions import ClientError
 
-from src.bedrock_agent_client import BedrockAgentClient
+from src._event_stream import drain_event_stream
+from src.bedrock_agent_client import BedrockAgentClient, _get_client, new_session_id
+
+
+@pytest.fixture(autouse=True)
+def _clear_client_cache() -> None:
+    """Drop cached boto3 clients so each test sees its own mock."""
+    _get_client.cache_clear()
 
 
 class TestBedrockAgentClient:
@@ -13,7 +22,7 @@ class TestBedrockAgentClient:
 
     def test_init_with_default_session(self) -> None:
         """Test client initialization with auto-generated session ID."""
-        with patch("src.bedrock_agent_client.boto3"):
+        with patch("boto3.client"):
             client = BedrockAgentClient("test-agent-id", "test-alias-id")
             assert client.agent_id == "test-agent-id"
             assert client.agent_alias_id == "test-alias-id"
@@ -21,10 +30,21 @@ class TestBedrockAgentClient:
             assert client.session_id is not None
             assert len(client.session_id) > 0
 
+    def test_new_session_id_is_uuid4(self) -> None:
+        """Test generated session IDs are unique, well-formed UUID4 strings."""
+        session_ids = {new_session_id() for _ in range(100)}
+
+        assert len(session_ids) == 100
+        for session_id in session_ids:
+            parsed = uuid.UUID(session_id)
+            assert str(parsed) == session_id
+            assert parsed.version == 4
+            assert parsed.variant == uuid.RFC_4122
+
     def test_init_with_custom_session(self) -> None:
         """Test client initialization with provided session ID."""
         custom_session = "custom-session-id"
-        with patch("src.bedrock_agent_client.boto3"):
+        with patch("boto3.client"):
             client = BedrockAgentClient(
                 "test-agent-id",
                 "test-alias-id",
@@ -32,12 +52,58 @@ class TestBedrockAgentClient:
             )
             assert client.session_id == custom_session
 
+    def test_init_configures_connection_pool(self) -> None:
+        """Test the boto3 client is built with pooling and keep-alive enabled."""
+        with patch("boto3.client") as mock_boto3_client:
+            BedrockAgentClient("test-agent-id", "test-alias-id", max_pool_connections=25)
+
+            config = mock_boto3_client.call_args[1]["config"]
+            assert config.max_pool_connections == 25
+            assert config.tcp_keepalive is True
+            assert config.retries == {"mode": "adaptive", "max_attempts": 5}
+
+    def test_clients_share_boto3_client(self) -> None:
+        """Test instances with the same settings reuse one boto3 client."""
+        with patch("boto3.client") as mock_boto3_client:
+            mock_boto3_client.side_effect = lambda *_args, **_kwargs: MagicMock()
+
+            first = BedrockAgentClient("agent-a", "alias-a")
+            second = BedrockAgentClient("agent-b", "alias-b")
+            other_region = BedrockAgentClient("agent-a", "alias-a", "us-east-1")
+
+            assert first.client is second.client
+            assert mock_boto3_client.call_count == 2
+            assert other_region.client is not first.client
+
+    def test_client_cache_is_bounded(self) -> None:
+        """Test clients for rotated session tokens are evicted from the cache."""
+        with patch("boto3.client") as mock_boto3_client:
+            mock_boto3_client.side_effect = lambda *_args, **_kwargs: MagicMock()
+
+            for i in range(20):
+                BedrockAgentClient(
+                    "agent", "alias", aws_access_key_id="AKID", aws_session_token=f"token-{i}"
+                )
+
+            assert _get_client.cache_info().currsize <= 8
+
+    def test_new_session_keeps_client(self) -> None:
+        """Test starting a new session does not rebuild the boto3 client."""
+        with patch("boto3.client") as mock_boto3_client:
+            client = BedrockAgentClient("test-agent-id", "test-alias-id")
+            boto3_client = client.client
+
+            client.new_session()
+
+            assert client.client is boto3_client
+            mock_boto3_client.assert_called_once()
+
     def test_invoke_agent_success(self) -> None:
         """Test successful agent invocation."""
-        with patch("src.bedrock_agent_client.boto3") as mock_boto3:
+        with patch("boto3.client") as mock_boto3_client:
             # Setup mock response
             mock_client = MagicMock()
-            mock_boto3.client.return_value = mock_client
+            mock_boto3_client.return_value = mock_client
 
             response_text = "Hello! How can I help you?"
             mock_event_stream = [
@@ -70,9 +136,9 @@ class TestBedrockAgentClient:
 
     def test_invoke_agent_with_trace(self) -> None:
         """Test agent invocation with trace enabled."""
-        with patch("src.bedrock_agent_client.boto3") as mock_boto3:
+        with patch("boto3.client") as mock_boto3_client:
             mock_client = MagicMock()
-            mock_boto3.client.return_value = mock_client
+            mock_boto3_client.return_value = mock_client
 
             mock_event_stream = [
                 {"chunk": {"bytes": b"Response"}},
@@ -89,9 +155,9 @@ class TestBedrockAgentClient:
 
     def test_invoke_agent_client_error(self) -> None:
         """Test agent invocation with AWS client error."""
-        with patch("src.bedrock_agent_client.boto3") as mock_boto3:
+        with patch("boto3.client") as mock_boto3_client:
             mock_client = MagicMock()
-            mock_boto3.client.return_value = mock_client
+            mock_boto3_client.return_value = mock_client
 
             # Simulate AWS error
             error_response = {
@@ -114,7 +180,7 @@ class TestBedrockAgentClient:
 
     def test_get_session_id(self) -> None:
         """Test getting the current session ID."""
-        with patch("src.bedrock_agent_client.boto3"):
+        with patch("boto3.client"):
             client = BedrockAgentClient("test-agent-id", "test-alias-id")
             session_id = client.get_session_id()
             assert session_id == client.session_id
@@ -122,7 +188,7 @@ class TestBedrockAgentClient:
 
     def test_new_session(self) -> None:
         """Test creating a new session."""
-        with patch("src.bedrock_agent_client.boto3"):
+        with patch("boto3.client"):
             client = BedrockAgentClient("test-agent-id", "test-alias-id")
             old_session = client.get_session_id()
 
@@ -134,9 +200,9 @@ class TestBedrockAgentClient:
 
     def test_invoke_agent_multiple_chunks(self) -> None:
         """Test agent invocation with multiple response chunks."""
-        with patch("src.bedrock_agent_client.boto3") as mock_boto3:
+        with patch("boto3.client") as mock_boto3_client:
             mock_client = MagicMock()
-            mock_boto3.client.return_value = mock_client
+            mock_boto3_client.return_value = mock_client
 
             mock_event_stream = [
                 {"chunk": {"bytes": b"Hello "}},
@@ -150,11 +216,96 @@ class TestBedrockAgentClient:
 
             assert result["completion"] == "Hello World!"
 
+    def test_invoke_agent_multibyte_split_across_chunks(self) -> None:
+        """Test a UTF-8 character split between chunks is decoded correctly."""
+        with patch("boto3.client") as mock_boto3_client:
+            mock_client = MagicMock()
+            mock_boto3_client.return_value = mock_client
+
+            encoded = "Hello 世界".encode()
+            mock_event_stream = [
+                {"chunk": {"bytes": encoded[:7]}},
+                {"chunk": {"bytes": encoded[7:]}},
+            ]
+            mock_client.invoke_agent.return_value = {"completion": mock_event_stream}
+
+            client = BedrockAgentClient("test-agent-id", "test-alias-id")
+            result = client.invoke_agent("Test")
+
+            assert result["completion"] == "Hello 世界"
+
+    def test_iter_invoke_agent_streams_chunks(self) -> None:
+        """Test the streaming variant yields each chunk as it arrives."""
+        with patch("boto3.client") as mock_boto3_client:
+            mock_client = MagicMock()
+            mock_boto3_client.return_value = mock_client
+
+            mock_event_stream = [
+                {"chunk": {"bytes": b"Hello "}},
+                {"trace": {"traceId": "test-trace"}},
+                {"chunk": {"bytes": b"World"}},
+            ]
+            mock_client.invoke_agent.return_value = {"completion": mock_event_stream}
+
+            client = BedrockAgentClient("test-agent-id", "test-alias-id")
+            trace_data: list[dict[str, str]] = []
+            pieces = list(client.iter_invoke_agent("Test", True, trace_data=trace_data))
+
+            assert pieces == ["Hello ", "World"]
+            assert trace_data == [{"traceId": "test-trace"}]
+
+    def test_iter_invoke_agent_multibyte_split_across_chunks(self) -> None:
+        """Test the streaming variant never yields half a UTF-8 character."""
+        with patch("boto3.client") as mock_boto3_client:
+            mock_client = MagicMock()
+            mock_boto3_client.return_value = mock_client
+
+            encoded = "Hi 🌍!".encode()
+            mock_event_stream = [
+                {"chunk": {"bytes": encoded[:5]}},
+                {"chunk": {"bytes": encoded[5:]}},
+            ]
+            mock_client.invoke_agent.return_value = {"completion": mock_event_stream}
+
+            client = BedrockAgentClient("test-agent-id", "test-alias-id")
+            pieces = list(client.iter_invoke_agent("Test"))
+
+            assert pieces == ["Hi ", "🌍!"]
+
+    def test_iter_invoke_agent_client_error(self) -> None:
+        """Test the streaming variant wraps AWS client errors."""
+        with patch("boto3.client") as mock_boto3_client:
+            mock_client = MagicMock()
+            mock_boto3_client.return_value = mock_client
+            mock_client.invoke_agent.side_effect = ClientError(
+                {"Error": {"Code": "AccessDeniedException", "Message": "Access denied"}},
+                "invoke_agent",
+            )
+
+            client = BedrockAgentClient("test-agent-id", "test-alias-id")
+
+            with pytest.raises(ClientError, match="Failed to invoke agent"):
+                list(client.iter_invoke_agent("Test"))
+
+    def test_invoke_agent_session_override(self) -> None:
+        """Test invoking in an explicit session leaves the current one unchanged."""
+        with patch("boto3.client") as mock_boto3_client:
+            mock_client = MagicMock()
+            mock_boto3_client.return_value = mock_client
+            mock_client.invoke_agent.return_value = {"completion": []}
+
+            client = BedrockAgentClient("test-agent-id", "test-alias-id")
+            result = client.invoke_agent("Test", session_id="other-session")
+
+            assert result["session_id"] == "other-session"
+            assert mock_client.invoke_agent.call_args[1]["sessionId"] == "other-session"
+            assert client.get_session_id() != "other-session"
+
     def test_invoke_agent_end_session(self) -> None:
         """Test agent invocation with end_session flag."""
-        with patch("src.bedrock_agent_client.boto3") as mock_boto3:
+        with patch("boto3.client") as mock_boto3_client:
             mock_client = MagicMock()
-            mock_boto3.client.return_value = mock_client
+            mock_boto3_client.return_value = mock_client
             mock_client.invoke_agent.return_value = {"completion": []}
 
             client = BedrockAgentClient("test-agent-id", "test-alias-id")
@@ -162,3 +313,67 @@ class TestBedrockAgentClient:
 
             call_args = mock_client.invoke_agent.call_args
             assert call_args[1]["endSession"] is True
+
+    def test_ainvoke_agent(self) -> None:
+        """Test async agent invocation returns the same result as the sync path."""
+        with patch("boto3.client") as mock_boto3_client:
+            mock_client = MagicMock()
+            mock_boto3_client.return_value = mock_client
+            mock_client.invoke_agent.return_value = {
+                "completion": [{"chunk": {"bytes": b"Async response"}}],
+            }
+
+            client = BedrockAgentClient("test-agent-id", "test-alias-id")
+            result = asyncio.run(client.ainvoke_agent("Hello"))
+
+            assert result["completion"] == "Async response"
+            assert result["session_id"] == client.session_id
+            mock_client.invoke_agent.assert_called_once()
+
+    def test_ainvoke_agent_client_error(self) -> None:
+        """Test async agent invocation propagates AWS client errors."""
+        with patch("boto3.client") as mock_boto3_client:
+            mock_client = MagicMock()
+            mock_boto3_client.return_value = mock_client
+            mock_client.invoke_agent.side_effect = ClientError(
+                {"Error": {"Code": "ThrottlingException", "Message": "Slow down"}},
+                "invoke_agent",
+            )
+
+            client = BedrockAgentClient("test-agent-id", "test-alias-id")
+
+            with pytest.raises(ClientError, match="Failed to invoke agent"):
+                asyncio.run(client.ainvoke_agent("Test"))
+
+
+class TestDrainEventStream:
+    """Test suite for drain_event_stream."""
+
+    @staticmethod
+    def test_drain_without_trace() -> None:
+        """Test chunks are concatenated and trace events are ignored."""
+        events = [
+            {"chunk": {"bytes": b"Hello "}},
+            {"trace": {"traceId": "ignored"}},
+            {"chunk": {}},
+            {"chunk": {"bytes": b"World"}},
+        ]
+
+        data, trace_data = drain_event_stream(events, False)
+
+        assert bytes(data) == b"Hello World"
+        assert trace_data == []
+
+    @staticmethod
+    def test_drain_with_trace() -> None:
+        """Test trace events are collected in order when enabled."""
+        events = [
+            {"trace": {"traceId": "first"}},
+            {"chunk": {"bytes": b"Response"}},
+            {"trace": {"traceId": "second"}},
+        ]
+
+        data, trace_data = drain_event_stream(events, True)
+
+        assert bytes(data) == b"Response"
+        assert trace_data == [{"traceId": "first"}, {"traceId": "second"}]
@@ -1,6 +1,8 @@
 """Unit tests for ChatApp."""
 
+import asyncio
 import tempfile
+import threading
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -29,6 +31,21 @@ class TestParseAgentArn:
         assert agent_id == "TESTID"
         assert region == "us-east-1"
 
+    @staticmethod
+    def test_parse_other_partition() -> None:
+        """Test parsing ARN from a non-commercial AWS partition."""
+        arn = "arn:aws-us-gov:bedrock:us-gov-west-1:123456789012:agent/GOVID"
+        agent_id, region = parse_agent_arn(arn)
+
+        assert agent_id == "GOVID"
+        assert region == "us-gov-west-1"
+
+    @staticmethod
+    def test_parse_arn_missing_agent_id() -> None:
+        """Test parsing ARN without an agent ID."""
+        with pytest.raises(ValueError, match="Invalid"):
+            parse_agent_arn("arn:aws:bedrock:us-west-2:123456789:agent/")
+
     @staticmethod
     def test_parse_invalid_arn_format() -> None:
         """Test parsing invalid ARN format."""
@@ -51,6 +68,18 @@ class TestParseAgentArn:
         with pytest.raises(ValueError, match="Invalid"):
             parse_agent_arn("")
 
+    @staticmethod
+    def test_parse_is_cached() -> None:
+        """Test repeated parses of one ARN are served from the cache."""
+        arn = "arn:aws:bedrock:eu-west-1:123456789:agent/CACHED123"
+        parse_agent_arn.cache_clear()
+
+        first = parse_agent_arn(arn)
+        second = parse_agent_arn(arn)
+
+        assert first == second == ("CACHED123", "eu-west-1")
+        assert parse_agent_arn.cache_info().hits == 1
+
 
 class TestChatApp:
     """Test suite for ChatApp."""
@@ -80,14 +109,17 @@ class TestChatApp:
             mock_client_cls.return_value = mock_client
 
             app = ChatApp("test-id", "test-alias", "us-west-2", tmpdir)
+            old_logger = app.logger
             app.new_session()
 
             mock_client.new_session.assert_called_once()
-            # Check that a new logger was created
+            # Check that a new logger was created in the same directory
             assert mock_logger_cls.call_count >= 2  # noqa: PLR2004
+            mock_logger_cls.assert_called_with(tmpdir, "new-session-id")
+            old_logger.close.assert_called_once()
 
     @staticmethod
-    def test_process_message_success() -> None:
+    def test_process_message_success(capsys: pytest.CaptureFixture[str]) -> None:
         """Test processing a successful message."""
         with (
             patch("src.chat_app.BedrockAgentClient") as mock_client_cls,
@@ -96,11 +128,8 @@ class TestChatApp:
         ):
             # Setup mocks
             mock_client = MagicMock()
-            mock_response = {
-                "completion": "Test response",
-                "session_id": "test-session",
-            }
-            mock_client.invoke_agent.return_value = mock_response
+            mock_client.iter_invoke_agent.return_value = iter(["Test ", "response"])
+            mock_client.get_session_id.return_value = "test-session"
             mock_client_cls.return_value = mock_client
 
             mock_logger = MagicMock()
@@ -111,8 +140,13 @@ class TestChatApp:
             result = app.process_message("Test input")
 
             assert result == "Test response"
-            mock_client.invoke_agent.assert_called_once_with("Test input")
-            mock_logger.log_exchange.assert_called_once()
+            mock_client.iter_invoke_agent.assert_called_once_with("Test input")
+            mock_logger.log_exchange.assert_called_once_with(
+                "Test input",
+                "Test response",
+                {"session_id": "test-session"},
+            )
+            assert "Agent: Test response" in capsys.readouterr().out
 
     @staticmethod
     def test_process_message_error() -> None:
@@ -124,7 +158,7 @@ class TestChatApp:
         ):
             # Setup mock to raise error
             mock_client = MagicMock()
-            mock_client.invoke_agent.side_effect = Exception("API Error")
+            mock_client.iter_invoke_agent.side_effect = Exception("API Error")
             mock_client_cls.return_value = mock_client
 
             app = ChatApp("test-id", "test-alias", "us-west-2", tmpdir)
@@ -132,6 +166,37 @@ class TestChatApp:
 
             assert result is None
 
+    @staticmethod
+    def test_run_batch() -> None:
+        """Test fanning out several prompts concurrently."""
+        with (
+            patch("src.chat_app.BedrockAgentClient") as mock_client_cls,
+            patch("src.chat_app.ChatHistoryLogger") as mock_logger_cls,
+            tempfile.TemporaryDirectory() as tmpdir,
+        ):
+
+            def invoke(prompt: str, session_id: str) -> dict[str, str]:
+                if prompt == "fail":
+                    raise RuntimeError("API Error")
+                return {"completion": prompt.upper(), "session_id": session_id}
+
+            mock_client = MagicMock()
+            mock_client.invoke_agent.side_effect = invoke
+            mock_client_cls.return_value = mock_client
+
+            mock_logger = MagicMock()
+            mock_logger_cls.return_value = mock_logger
+
+            app = ChatApp("test-id", "test-alias", "us-west-2", tmpdir)
+            results = app.run_batch(["one", "fail", "two"], max_workers=2)
+
+            assert results == ["ONE", None, "TWO"]
+            assert mock_logger.log_exchange.call_count == 2
+            session_ids = {
+                call[1]["session_id"] for call in mock_client.invoke_agent.call_args_list
+            }
+            assert len(session_ids) == 3
+
     @staticmethod
     def test_display_history(capsys: pytest.CaptureFixture[str]) -> None:
         """Test displaying chat history."""
@@ -153,7 +218,7 @@ class TestChatApp:
                     "content": "Hi there",
                 },
             ]
-            mock_logger.read_history.return_value = mock_history
+            mock_logger.iter_history.return_value = iter(mock_history)
             mock_logger_cls.return_value = mock_logger
 
             app = ChatApp("test-id", "test-alias", "us-west-2", tmpdir)
@@ -174,7 +239,7 @@ class TestChatApp:
             tempfile.TemporaryDirectory() as tmpdir,
         ):
             mock_logger = MagicMock()
-            mock_logger.read_history.return_value = []
+            mock_logger.iter_history.return_value = iter([])
             mock_logger_cls.return_value = mock_logger
 
             app = ChatApp("test-id", "test-alias", "us-west-2", tmpdir)
@@ -182,3 +247,203 @@ class TestChatApp:
 
             captured = capsys.readouterr()
             assert "No chat history" in captured.out
+
+    @staticmethod
+    def test_display_welcome(capsys: pytest.CaptureFixture[str]) -> None:
+        """Test the welcome banner shows the current session details."""
+        with (
+            patch("src.chat_app.BedrockAgentClient") as mock_client_cls,
+            patch("src.chat_app.ChatHistoryLogger") as mock_logger_cls,
+            tempfile.TemporaryDirectory() as tmpdir,
+        ):
+            mock_client = MagicMock()
+            mock_client.get_session_id.return_value = "first-session"
+            mock_client.new_session.return_value = "second-session"
+            mock_client_cls.return_value = mock_client
+            mock_logger_cls.return_value.get_log_path.return_value = "logs/chat.log"
+
+            app = ChatApp("test-id", "test-alias", "us-west-2", tmpdir)
+            app.display_welcome()
+
+            captured = capsys.readouterr()
+            assert "AWS Bedrock Agent Chat" in captured.out
+            assert "Session ID: first-session" in captured.out
+            assert "Log file: logs/chat.log" in captured.out
+
+            mock_client.get_session_id.return_value = "second-session"
+            app.new_session()
+            capsys.readouterr()
+            app.display_welcome()
+
+            assert "Session ID: second-session" in capsys.readouterr().out
+
+    @staticmethod
+    def test_aprocess_message_success() -> None:
+        """Test processing a message from the event loop."""
+        with (
+            patch("src.chat_app.BedrockAgentClient") as mock_client_cls,
+            patch("src.chat_app.ChatHistoryLogger") as mock_logger_cls,
+            tempfile.TemporaryDirectory() as tmpdir,
+        ):
+            mock_client = MagicMock()
+            mock_client.iter_invoke_agent.return_value = iter(["Async response"])
+            mock_client_cls.return_value = mock_client
+
+            mock_logger = MagicMock()
+            mock_logger_cls.return_value = mock_logger
+
+            app = ChatApp("test-id", "test-alias", "us-west-2", tmpdir)
+            result = asyncio.run(app.aprocess_message("Test input"))
+
+            assert result == "Async response"
+            mock_logger.log_exchange.assert_called_once()
+
+    @staticmethod
+    def test_aprocess_message_runs_on_daemon_thread() -> None:
+        """Test the agent call runs on a daemon thread so Ctrl-C never waits for it."""
+        with (
+            patch("src.chat_app.BedrockAgentClient"),
+            patch("src.chat_app.ChatHistoryLogger"),
+            tempfile.TemporaryDirectory() as tmpdir,
+        ):
+            app = ChatApp("test-id", "test-alias", "us-west-2", tmpdir)
+            threads = []
+
+            def process_message(user_input: str) -> str:
+                threads.append(threading.current_thread())
+                return user_input.upper()
+
+            with patch.object(app, "process_message", side_effect=process_message):
+                result = asyncio.run(app.aprocess_message("hi"))
+
+            assert result == "HI"
+            assert threads[0].daemon
+            assert threads[0] is not threading.main_thread()
+
+    @staticmethod
+    def test_aprocess_message_propagates_errors() -> None:
+        """Test an exception from the agent call is raised in the event loop."""
+        with (
+            patch("src.chat_app.BedrockAgentClient"),
+            patch("src.chat_app.ChatHistoryLogger"),
+            tempfile.TemporaryDirectory() as tmpdir,
+        ):
+            app = ChatApp("test-id", "test-alias", "us-west-2", tmpdir)
+
+            with (
+                patch.object(app, "process_message", side_effect=RuntimeError("boom")),
+                pytest.raises(RuntimeError, match="boom"),
+            ):
+                asyncio.run(app.aprocess_message("hi"))
+
+    @staticmethod
+    def test_handle_command() -> None:
+        """Test command dispatch for the chat loop."""
+        with (
+            patch("src.chat_app.BedrockAgentClient"),
+            patch("src.chat_app.ChatHistoryLogger"),
+            tempfile.TemporaryDirectory() as tmpdir,
+        ):
+            app = ChatApp("test-id", "test-alias", "us-west-2", tmpdir)
+            app.running = True
+
+            assert app.handle_command("Hello") is False
+            assert app.running is True
+
+            assert app.handle_command("EXIT") is True
+            assert app.running is False
+
+    @staticmethod
+    def test_run() -> None:
+        """Test the chat loop processes queued input until quit."""
+        with (
+            patch("src.chat_app.BedrockAgentClient") as mock_client_cls,
+            patch("src.chat_app.ChatHistoryLogger"),
+            patch("builtins.input", side_effect=["", "Hello", "quit"]),
+            tempfile.TemporaryDirectory() as tmpdir,
+        ):
+            mock_client = MagicMock()
+            mock_client.iter_invoke_agent.return_value = iter(["Hi there"])
+            mock_client_cls.return_value = mock_client
+
+            app = ChatApp("test-id", "test-alias", "us-west-2", tmpdir)
+            app.run()
+
+            mock_client.iter_invoke_agent.assert_called_once_with("Hello")
+            assert app.running is False
+
+    @staticmethod
+    def test_run_eof() -> None:
+        """Test the chat loop exits cleanly on end of input."""
+        with (
+            patch("src.chat_app.BedrockAgentClient"),
+            patch("src.chat_app.ChatHistoryLogger"),
+            patch("builtins.input", side_effect=EOFError),
+            tempfile.TemporaryDirectory() as tmpdir,
+        ):
+            app = ChatApp("test-id", "test-alias", "us-west-2", tmpdir)
+            app.run()
+
+            assert app.running is False
+
+    @staticmethod
+    def test_run_input_error() -> None:
+        """Test a stdin read error is raised from the chat loop instead of hanging it."""
+        bad_byte = UnicodeDecodeError("utf-8", b"\xff", 0, 1, "invalid start byte")
+        with (
+            patch("src.chat_app.BedrockAgentClient"),
+            patch("src.chat_app.ChatHistoryLogger"),
+            patch("builtins.input", side_effect=bad_byte),
+            tempfile.TemporaryDirectory() as tmpdir,
+        ):
+            app = ChatApp("test-id", "test-alias", "us-west-2", tmpdir)
+
+            with pytest.raises(UnicodeDecodeError):
+                app.run()
+
+    @staticmethod
+    def test_arun() -> None:
+        """Test the async chat loop processes messages until quit."""
+        with (
+            patch("src.chat_app.BedrockAgentClient") as mock_client_cls,
+            patch("src.chat_app.ChatHistoryLogger"),
+            patch("builtins.input", side_effect=["", "Hello", "quit"]),
+            tempfile.TemporaryDirectory() as tmpdir,
+        ):
+            mock_client = MagicMock()
+            mock_client.iter_invoke_agent.return_value = iter(["Hi there"])
+            mock_client_cls.return_value = mock_client
+
+            app = ChatApp("test-id", "test-alias", "us-west-2", tmpdir)
+            asyncio.run(app.arun())
+
+            mock_client.iter_invoke_agent.assert_called_once_with("Hello")
+            assert app.running is False
+
+    @staticmethod
+    def test_arun_eof() -> None:
+        """Test the async chat loop exits cleanly on end of input."""
+        with (
+            patch("src.chat_app.BedrockAgentClient"),
+            patch("src.chat_app.ChatHistoryLogger"),
+            patch("builtins.input", side_effect=EOFError),
+            tempfile.TemporaryDirectory() as tmpdir,
+        ):
+            app = ChatApp("test-id", "test-alias", "us-west-2", tmpdir)
+            asyncio.run(app.arun())
+
+            assert app.running is False
+
+    @staticmethod
+    def test_arun_input_error() -> None:
+        """Test a stdin read error is raised from the async chat loop."""
+        with (
+            patch("src.chat_app.BedrockAgentClient"),
+            patch("src.chat_app.ChatHistoryLogger"),
+            patch("builtins.input", side_effect=OSError("tty closed")),
+            tempfile.TemporaryDirectory() as tmpdir,
+        ):
+            app = ChatApp("test-id", "test-alias", "us-west-2", tmpdir)
+
+            with pytest.raises(OSError, match="tty closed"):
+                asyncio.run(app.arun())
@@ -1,182 +1,534 @@
 """Unit tests for ChatHistoryLogger."""
 
+import gc
 import json
-import tempfile
-from datetime import datetime
+import os
+import subprocess
+import sys
+import time
+from collections.abc import Iterator
+from datetime import datetime, timezone
 from pathlib import Path
+from unittest.mock import patch
+
+import pytest
 
 from src.chat_history_logger import ChatHistoryLogger
 
 
+def _seed_log(path: Path, lines: list[bytes]) -> None:
+    """Replace a log file's contents with the given raw lines."""
+    path.write_bytes(b"\n".join(lines) + b"\n")
+
+
+@pytest.fixture
+def logger(tmp_path: Path) -> Iterator[ChatHistoryLogger]:
+    """Provide a JSONL logger in a per-test directory and close it afterwards."""
+    with ChatHistoryLogger(tmp_path) as history_logger:
+        yield history_logger
+
+
+@pytest.fixture
+def msgpack_logger(tmp_path: Path) -> Iterator[ChatHistoryLogger]:
+    """Provide a MessagePack logger in a per-test directory and close it afterwards."""
+    pytest.importorskip("msgpack")
+    with ChatHistoryLogger(tmp_path, log_format="msgpack") as history_logger:
+        yield history_logger
+
+
 class TestChatHistoryLogger:
     """Test suite for ChatHistoryLogger."""
 
     @staticmethod
-    def test_init_creates_directory() -> None:
+    def test_init_creates_directory(tmp_path: Path) -> None:
         """Test that logger creates log directory if it doesn't exist."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            log_dir = Path(tmpdir) / "test_logs"
-            logger = ChatHistoryLogger(str(log_dir))
-
+        log_dir = tmp_path / "test_logs"
+        with ChatHistoryLogger(str(log_dir)) as logger:
             assert log_dir.exists()
             assert logger.log_file.parent == log_dir
 
     @staticmethod
-    def test_init_with_session_id() -> None:
+    def test_init_with_session_id(tmp_path: Path) -> None:
         """Test logger initialization with session ID."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            session_id = "test-session-123"
-            logger = ChatHistoryLogger(tmpdir, session_id)
-
+        session_id = "test-session-123"
+        with ChatHistoryLogger(tmp_path, session_id) as logger:
             # Check that session ID is in filename
             assert session_id[:8] in logger.log_file.name
 
     @staticmethod
-    def test_log_message() -> None:
+    def test_log_message(logger: ChatHistoryLogger) -> None:
         """Test logging a single message."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            logger = ChatHistoryLogger(tmpdir)
+        logger.log_message("user", "Hello world")
+        logger.flush()
+
+        # Read the log file
+        with logger.log_file.open(encoding="utf-8") as f:
+            line = f.readline()
+            entry = json.loads(line)
+
+        assert entry["role"] == "user"
+        assert entry["content"] == "Hello world"
+        assert "timestamp" in entry
+        # Verify timestamp is valid ISO format
+        datetime.fromisoformat(entry["timestamp"])
+
+    @staticmethod
+    def test_log_line_matches_json_encoding(logger: ChatHistoryLogger) -> None:
+        """Test the precomputed key skeleton produces the same line as json.dumps."""
+        metadata = {"session_id": "abc", "nested": {"quote": '"'}}
+        logger.log_message("agent", 'Say "hi"\n\t\\ 世界', metadata)
+        logger.flush()
+
+        line = logger.log_file.read_bytes()
+        entry = json.loads(line)
+        expected = json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+        assert line == (expected + "\n").encode("utf-8")
+        assert list(entry) == ["timestamp", "role", "content", "metadata"]
+        assert entry["content"] == 'Say "hi"\n\t\\ 世界'
 
-            logger.log_message("user", "Hello world")
+    @staticmethod
+    def test_timestamp_reuses_formatted_second(logger: ChatHistoryLogger) -> None:
+        """Test timestamps within one second only differ in their fraction."""
+        second = 1_700_000_000 * 1_000_000_000
+
+        with patch("src.chat_history_logger.time.time_ns", return_value=second + 1_500):
+            first = logger._timestamp()
+        with (
+            patch("src.chat_history_logger.time.time_ns", return_value=second + 999_999_000),
+            patch("src.chat_history_logger.time.strftime") as strftime,
+        ):
+            again = logger._timestamp()
+
+        strftime.assert_not_called()
+        assert first == "2023-11-14T22:13:20.000001+00:00"
+        assert again == "2023-11-14T22:13:20.999999+00:00"
+        assert datetime.fromisoformat(again) == datetime.fromtimestamp(
+            1_700_000_000.999999, tz=timezone.utc
+        )
+
+    @staticmethod
+    def test_writer_thread_writes_queued_messages(logger: ChatHistoryLogger) -> None:
+        """Test queued messages are written in order by the writer thread."""
+        for i in range(50):
+            logger.log_message("user", f"Message {i}")
+        logger.flush()
+
+        lines = logger.log_file.read_bytes().splitlines()
+        assert [json.loads(line)["content"] for line in lines] == [
+            f"Message {i}" for i in range(50)
+        ]
 
-            # Read the log file
-            with logger.log_file.open(encoding="utf-8") as f:
-                line = f.readline()
-                entry = json.loads(line)
+        logger.close()
+        assert not logger._worker.is_alive()
 
-            assert entry["role"] == "user"
-            assert entry["content"] == "Hello world"
-            assert "timestamp" in entry
-            # Verify timestamp is valid ISO format
-            datetime.fromisoformat(entry["timestamp"])
+    @staticmethod
+    def test_unclosed_logger_is_written_out_when_released(tmp_path: Path) -> None:
+        """Test dropping the last reference to an unclosed logger writes out its entries.
+
+        The cycle collector is disabled, so this only passes if the logger is
+        freed by reference counting alone.
+        """
+        logger = ChatHistoryLogger(tmp_path)
+        log_file = logger.log_file
+        worker = logger._worker
+        logger.log_exchange("Question", "Answer")
+
+        gc.disable()
+        try:
+            del logger
+            assert not worker.is_alive()
+        finally:
+            gc.enable()
+
+        assert len(log_file.read_bytes().splitlines()) == 2
+
+    @staticmethod
+    def test_unclosed_logger_is_written_out_at_exit(tmp_path: Path) -> None:
+        """Test entries logged right before the interpreter exits reach the file."""
+        script = (
+            "import sys\n"
+            "from src.chat_history_logger import ChatHistoryLogger\n"
+            "logger = ChatHistoryLogger(sys.argv[1])\n"
+            "logger.log_exchange('Question', 'Answer')\n"
+            "print(logger.log_file)\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script, str(tmp_path)],
+            capture_output=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent.parent,
+            text=True,
+        )
+
+        log_file = Path(result.stdout.strip())
+        assert len(log_file.read_bytes().splitlines()) == 2
 
     @staticmethod
-    def test_log_message_with_metadata() -> None:
+    def test_log_after_close_raises(logger: ChatHistoryLogger) -> None:
+        """Test writes after close are rejected instead of queued and lost."""
+        logger.log_message("user", "Kept")
+        logger.close()
+
+        with pytest.raises(ValueError, match="closed"):
+            logger.log_message("user", "Late")
+        with pytest.raises(ValueError, match="closed"):
+            logger.log_exchange("Late", "Reply")
+
+        assert [entry["content"] for entry in logger.read_history()] == ["Kept"]
+        logger.close()
+
+    @staticmethod
+    def test_flush_raises_write_error(logger: ChatHistoryLogger) -> None:
+        """Test a write failure on the writer thread is raised from flush."""
+        with patch("src.chat_history_logger.os.write", side_effect=OSError("disk full")):
+            logger.log_message("user", "Lost")
+            with pytest.raises(OSError, match="disk full"):
+                logger.flush()
+
+        logger.flush()
+
+    @staticmethod
+    def test_short_writes_are_resumed(logger: ChatHistoryLogger) -> None:
+        """Test a batch is fully written when the kernel accepts only part of it."""
+        real_write = os.write
+
+        def short_write(fd: int, data: memoryview) -> int:
+            return real_write(fd, data[:7])
+
+        with patch("src.chat_history_logger.os.write", side_effect=short_write):
+            logger.log_exchange("Question", "Answer")
+            logger.flush()
+
+        assert [entry["content"] for entry in logger.read_history()] == ["Question", "Answer"]
+
+    @staticmethod
+    def test_log_message_with_metadata(logger: ChatHistoryLogger) -> None:
         """Test logging a message with metadata."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            logger = ChatHistoryLogger(tmpdir)
+        metadata = {"session_id": "test-123", "model": "claude"}
+        logger.log_message("agent", "Response", metadata)
+        logger.flush()
 
-            metadata = {"session_id": "test-123", "model": "claude"}
-            logger.log_message("agent", "Response", metadata)
+        with logger.log_file.open(encoding="utf-8") as f:
+            entry = json.loads(f.readline())
 
-            with logger.log_file.open(encoding="utf-8") as f:
-                entry = json.loads(f.readline())
+        assert entry["metadata"] == metadata
 
-            assert entry["metadata"] == metadata
+    @staticmethod
+    def test_log_message_with_non_str_metadata_keys(logger: ChatHistoryLogger) -> None:
+        """Test metadata keys are coerced to strings like json.dumps does."""
+        logger.log_message("agent", "Response", {1: "one", "nested": {2.5: True}})
+
+        assert logger.read_history()[0]["metadata"] == {"1": "one", "nested": {"2.5": True}}
 
     @staticmethod
-    def test_log_exchange() -> None:
+    def test_log_exchange(logger: ChatHistoryLogger) -> None:
         """Test logging a complete user-agent exchange."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            logger = ChatHistoryLogger(tmpdir)
-
-            logger.log_exchange("User question", "Agent answer")
+        logger.log_exchange("User question", "Agent answer")
+        logger.flush()
 
-            with logger.log_file.open(encoding="utf-8") as f:
-                lines = f.readlines()
+        with logger.log_file.open(encoding="utf-8") as f:
+            lines = f.readlines()
 
-            assert len(lines) == 2
+        assert len(lines) == 2
 
-            user_entry = json.loads(lines[0])
-            assert user_entry["role"] == "user"
-            assert user_entry["content"] == "User question"
+        user_entry = json.loads(lines[0])
+        assert user_entry["role"] == "user"
+        assert user_entry["content"] == "User question"
 
-            agent_entry = json.loads(lines[1])
-            assert agent_entry["role"] == "agent"
-            assert agent_entry["content"] == "Agent answer"
+        agent_entry = json.loads(lines[1])
+        assert agent_entry["role"] == "agent"
+        assert agent_entry["content"] == "Agent answer"
 
     @staticmethod
-    def test_log_exchange_with_metadata() -> None:
+    def test_log_exchange_with_metadata(logger: ChatHistoryLogger) -> None:
         """Test logging an exchange with metadata."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            logger = ChatHistoryLogger(tmpdir)
+        metadata = {"temperature": 0.7}
+        logger.log_exchange("Question", "Answer", metadata)
+        logger.flush()
 
-            metadata = {"temperature": 0.7}
-            logger.log_exchange("Question", "Answer", metadata)
+        with logger.log_file.open(encoding="utf-8") as f:
+            lines = f.readlines()
 
-            with logger.log_file.open(encoding="utf-8") as f:
-                lines = f.readlines()
+        for line in lines:
+            entry = json.loads(line)
+            assert entry["metadata"] == metadata
 
-            for line in lines:
-                entry = json.loads(line)
-                assert entry["metadata"] == metadata
+    @staticmethod
+    def test_log_messages(logger: ChatHistoryLogger) -> None:
+        """Test logging several messages in one batch."""
+        messages = [("user", "One"), ("agent", "Two"), ("user", "Three")]
+        logger.log_messages(messages, {"source": "replay"})
+        logger.flush()
+
+        with logger.log_file.open(encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f]
+
+        assert [(e["role"], e["content"]) for e in entries] == messages
+        assert all(e["metadata"] == {"source": "replay"} for e in entries)
+        assert len({e["timestamp"] for e in entries}) == 1
 
     @staticmethod
-    def test_get_log_path() -> None:
+    def test_get_log_path(logger: ChatHistoryLogger) -> None:
         """Test getting the log file path."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            logger = ChatHistoryLogger(tmpdir)
-            path = logger.get_log_path()
+        path = logger.get_log_path()
 
-            assert isinstance(path, Path)
-            assert path == logger.log_file
+        assert isinstance(path, Path)
+        assert path == logger.log_file
 
     @staticmethod
-    def test_read_history_empty() -> None:
+    def test_read_history_empty(logger: ChatHistoryLogger) -> None:
         """Test reading history from empty log file."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            logger = ChatHistoryLogger(tmpdir)
-            history = logger.read_history()
+        history = logger.read_history()
 
-            assert history == []
+        assert history == []
 
     @staticmethod
-    def test_read_history() -> None:
+    def test_read_history(logger: ChatHistoryLogger) -> None:
         """Test reading chat history."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            logger = ChatHistoryLogger(tmpdir)
+        # Log some messages
+        logger.log_message("user", "First message")
+        logger.log_message("agent", "First response")
+        logger.log_message("user", "Second message")
+
+        # Consume the history one entry at a time
+        history = logger.iter_history()
+
+        for role, content in [
+            ("user", "First message"),
+            ("agent", "First response"),
+            ("user", "Second message"),
+        ]:
+            entry = next(history)
+            assert entry["role"] == role
+            assert entry["content"] == content
+        assert next(history, None) is None
+
+    @staticmethod
+    def test_iter_history(logger: ChatHistoryLogger) -> None:
+        """Test lazily iterating over chat history."""
+        logger.log_exchange("Question", "Answer")
+
+        history = logger.iter_history()
+        assert next(history)["content"] == "Question"
+        assert next(history)["content"] == "Answer"
+        assert next(history, None) is None
 
-            # Log some messages
-            logger.log_message("user", "First message")
-            logger.log_message("agent", "First response")
-            logger.log_message("user", "Second message")
+    @staticmethod
+    def test_read_history_parses_only_new_lines(logger: ChatHistoryLogger) -> None:
+        """Test repeated reads only parse lines appended since the last read."""
+        logger.log_exchange("First", "Reply")
+
+        assert len(logger.read_history()) == 2
 
-            # Read history
+        logger.log_message("user", "Second")
+        with patch("src.chat_history_logger._loads", side_effect=json.loads) as loads:
             history = logger.read_history()
 
-            assert len(history) == 3
-            assert history[0]["role"] == "user"
-            assert history[0]["content"] == "First message"
-            assert history[1]["role"] == "agent"
-            assert history[1]["content"] == "First response"
-            assert history[2]["role"] == "user"
-            assert history[2]["content"] == "Second message"
+        assert [entry["content"] for entry in history] == ["First", "Reply", "Second"]
+        loads.assert_called_once()
+        assert b"First" not in loads.call_args[0][0]
 
     @staticmethod
-    def test_read_history_with_blank_lines() -> None:
-        """Test reading history with blank lines in log file."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            logger = ChatHistoryLogger(tmpdir)
+    def test_read_history_parses_in_one_call(logger: ChatHistoryLogger) -> None:
+        """Test all unread lines are decoded with a single parser call."""
+        logger.log_messages([("user", f"Message {i}") for i in range(5)])
 
-            # Manually write with blank lines
-            with logger.log_file.open("w", encoding="utf-8") as f:
-                f.write('{"role": "user", "content": "Test"}\n')
-                f.write("\n")  # Blank line
-                f.write('{"role": "agent", "content": "Response"}\n')
+        with patch("src.chat_history_logger._loads", side_effect=json.loads) as loads:
+            history = logger.read_history()
+
+        assert [entry["content"] for entry in history] == [f"Message {i}" for i in range(5)]
+        loads.assert_called_once()
 
+    @staticmethod
+    def test_read_history_skips_partial_line(logger: ChatHistoryLogger) -> None:
+        """Test a line without its trailing newline is left for the next read."""
+        logger.log_message("user", "Complete")
+        logger.flush()
+        with logger.log_file.open("ab") as f:
+            f.write(b'{"role":"agent","content":"Par')
+
+        assert [entry["content"] for entry in logger.read_history()] == ["Complete"]
+
+        with logger.log_file.open("ab") as f:
+            f.write(b'tial"}\n')
+
+        assert logger.read_history()[-1]["content"] == "Partial"
+
+    @staticmethod
+    def test_read_history_large_tail_uses_mmap(logger: ChatHistoryLogger) -> None:
+        """Test tails above the mmap threshold are parsed from a memory map."""
+        logger.log_message("user", "First")
+        logger.read_history()
+        logger.log_message("agent", "Second")
+        logger.flush()
+        with logger.log_file.open("ab") as f:
+            f.write(b'\n{"role":"user","content":"Third"}\n{"role":"agent","con')
+
+        with patch("src.chat_history_logger._MMAP_THRESHOLD", 0):
             history = logger.read_history()
 
-            # Should skip blank lines
-            assert len(history) == 2
+        assert [entry["content"] for entry in history] == ["First", "Second", "Third"]
+
+        with logger.log_file.open("ab") as f:
+            f.write(b'tent":"Fourth"}\n')
+
+        with patch("src.chat_history_logger._MMAP_THRESHOLD", 0):
+            assert logger.read_history()[-1]["content"] == "Fourth"
 
     @staticmethod
-    def test_log_file_naming() -> None:
+    def test_read_history_unchanged_file_uses_cache(logger: ChatHistoryLogger) -> None:
+        """Test re-reading an unchanged log does not reopen the file."""
+        logger.log_exchange("Question", "Answer")
+        first = logger.read_history()
+
+        with patch.object(Path, "open", side_effect=AssertionError("reopened")):
+            second = logger.read_history()
+
+        assert second == first
+
+    @staticmethod
+    def test_read_history_after_truncation(logger: ChatHistoryLogger) -> None:
+        """Test history is re-read from the start if the log is rewritten."""
+        logger.log_exchange("Question", "Answer")
+        assert len(logger.read_history()) == 2
+
+        _seed_log(logger.log_file, [b'{"role":"user","content":"Only"}'])
+        history = logger.read_history()
+
+        assert [entry["content"] for entry in history] == ["Only"]
+
+    @staticmethod
+    def test_read_history_with_blank_lines(logger: ChatHistoryLogger) -> None:
+        """Test reading history with blank lines in log file."""
+        _seed_log(
+            logger.log_file,
+            [b'{"role":"user","content":"Test"}', b"", b'{"role":"agent","content":"Response"}'],
+        )
+
+        history = logger.read_history()
+
+        # Should skip blank lines
+        assert len(history) == 2
+
+    @staticmethod
+    def test_log_file_naming(logger: ChatHistoryLogger) -> None:
         """Test that log file has correct naming pattern."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            logger = ChatHistoryLogger(tmpdir)
+        filename = logger.log_file.name
+        assert filename.startswith("chat_history_")
+        assert filename.endswith(".log")
 
-            filename = logger.log_file.name
-            assert filename.startswith("chat_history_")
-            assert filename.endswith(".log")
+    @staticmethod
+    def test_log_file_name_uses_utc_time(tmp_path: Path) -> None:
+        """Test the file name carries the UTC creation time and session prefix."""
+        created = time.gmtime(1_700_000_000)
+        with (
+            patch("src.chat_history_logger.time.gmtime", return_value=created),
+            ChatHistoryLogger(tmp_path, "abcdef123456") as logger,
+        ):
+            assert logger.log_file.name == "chat_history_20231114_221320_abcdef12.log"
 
     @staticmethod
-    def test_unicode_content() -> None:
+    def test_unicode_content(logger: ChatHistoryLogger) -> None:
         """Test logging messages with unicode characters."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            logger = ChatHistoryLogger(tmpdir)
+        unicode_message = "Hello 世界 🌍 émojis"
+        logger.log_message("user", unicode_message)
 
-            unicode_message = "Hello 世界 🌍 émojis"
-            logger.log_message("user", unicode_message)
+        history = logger.read_history()
+        assert history[0]["content"] == unicode_message
 
-            history = logger.read_history()
-            assert history[0]["content"] == unicode_message
+    @staticmethod
+    def test_log_exchange_encodes_metadata_once(logger: ChatHistoryLogger) -> None:
+        """Test the metadata of an exchange is encoded once for both entries."""
+        with patch.object(
+            logger, "_encode_metadata", wraps=logger._encode_metadata
+        ) as encode_metadata:
+            metadata = {"model": {"name": "claude", "temperature": 0.7}}
+            logger.log_exchange("Question", "Answer", metadata)
+
+            encode_metadata.assert_called_once_with(metadata)
+            assert [entry["metadata"] for entry in logger.read_history()] == [metadata] * 2
+
+    @staticmethod
+    def test_log_exchange_shares_timestamp(logger: ChatHistoryLogger) -> None:
+        """Test both entries of an exchange carry the same timestamp."""
+        logger.log_exchange("Question", "Answer")
+
+        user_entry, agent_entry = logger.read_history()
+        assert user_entry["timestamp"] == agent_entry["timestamp"]
+
+    @staticmethod
+    def test_context_manager_closes_file(tmp_path: Path) -> None:
+        """Test the logger flushes and closes its file on context exit."""
+        with ChatHistoryLogger(tmp_path) as logger:
+            logger.log_message("user", "Buffered")
+
+        with logger.log_file.open(encoding="utf-8") as f:
+            entry = json.loads(f.readline())
+
+        assert entry["content"] == "Buffered"
+        assert logger.read_history()[0]["content"] == "Buffered"
+
+    @staticmethod
+    def test_invalid_log_format(tmp_path: Path) -> None:
+        """Test an unsupported log format is rejected."""
+        with pytest.raises(ValueError, match="format"):
+            ChatHistoryLogger(tmp_path, log_format="xml")
+
+
+class TestMsgpackChatHistoryLogger:
+    """Test suite for the MessagePack log format."""
+
+    @staticmethod
+    def test_log_file_naming(msgpack_logger: ChatHistoryLogger) -> None:
+        """Test MessagePack logs use the .mpk extension."""
+        assert msgpack_logger.log_file.name.startswith("chat_history_")
+        assert msgpack_logger.log_file.suffix == ".mpk"
+
+    @staticmethod
+    def test_round_trip(msgpack_logger: ChatHistoryLogger) -> None:
+        """Test messages written as MessagePack read back unchanged."""
+        logger = msgpack_logger
+        logger.log_exchange("Hello 世界 🌍", "Answer", {"session_id": "abc"})
+        logger.log_message("user", "Follow-up")
+        history = logger.read_history()
+
+        assert [entry["content"] for entry in history] == [
+            "Hello 世界 🌍",
+            "Answer",
+            "Follow-up",
+        ]
+        assert history[0]["metadata"] == {"session_id": "abc"}
+        assert history[1]["metadata"] == {"session_id": "abc"}
+        assert "metadata" not in history[2]
+        datetime.fromisoformat(history[0]["timestamp"])
+
+    @staticmethod
+    def test_log_message_with_non_str_metadata_keys(msgpack_logger: ChatHistoryLogger) -> None:
+        """Test metadata with non-str keys reads back, and later reads still work."""
+        msgpack_logger.log_message("user", "x", {1: "one", "nested": {2.5: True}})
+        msgpack_logger.log_message("agent", "y")
+
+        history = msgpack_logger.read_history()
+
+        assert history[0]["metadata"] == {1: "one", "nested": {2.5: True}}
+        assert [entry["content"] for entry in msgpack_logger.read_history()] == ["x", "y"]
+
+    @staticmethod
+    def test_read_skips_partial_record(msgpack_logger: ChatHistoryLogger) -> None:
+        """Test a partially written record is left for the next read."""
+        msgpack = pytest.importorskip("msgpack")
+        logger = msgpack_logger
+        logger.log_exchange("Question", "Answer")
+        logger.flush()
+
+        packed = msgpack.packb({"role": "user", "content": "Late"})
+        header = len(packed).to_bytes(4, "little")
+        with logger.log_file.open("ab") as f:
+            f.write(header + packed[:3])
+
+        assert len(logger.read_history()) == 2
+
+        with logger.log_file.open("ab") as f:
+            f.write(packed[3:])
+
+        assert logger.read_history()[-1]["content"] == "Late"
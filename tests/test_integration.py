@@ -10,7 +10,6 @@ import tempfile
 import pytest
 
 from src.bedrock_agent_client import BedrockAgentClient
-from src.chat_app import parse_agent_arn
 from src.chat_history_logger import ChatHistoryLogger
 
 
@@ -23,31 +22,10 @@ class TestIntegration:
     """Integration tests requiring real AWS credentials and agent."""
 
     @staticmethod
-    def get_agent_config() -> tuple[str, str, str]:
-        """Get agent configuration from environment.
-
-        Returns:
-            Tuple of (agent_id, agent_alias_id, region)
-        """
-        agent_arn = os.getenv("BEDROCK_AGENT_ARN")
-        agent_id = os.getenv("BEDROCK_AGENT_ID")
-        agent_alias_id = os.getenv("BEDROCK_AGENT_ALIAS_ID", "TSTALIASID")
-        region = os.getenv("AWS_REGION", "us-west-2")
-
-        if agent_arn and not agent_id:
-            agent_id, region = parse_agent_arn(agent_arn)
-
-        if not agent_id:
-            pytest.skip("BEDROCK_AGENT_ID or BEDROCK_AGENT_ARN not configured")
-
-        return agent_id, agent_alias_id, region
-
-    @staticmethod
-    def test_bedrock_client_integration() -> None:
+    def test_bedrock_client_integration(bedrock_client: BedrockAgentClient) -> None:
         """Test real interaction with Bedrock agent."""
-        agent_id, agent_alias_id, region = TestIntegration.get_agent_config()
-
-        client = BedrockAgentClient(agent_id, agent_alias_id, region)
+        client = bedrock_client
+        client.new_session()
 
         # Send a simple test message
         response = client.invoke_agent("Hello, can you help me?")
@@ -60,12 +38,10 @@ class TestIntegration:
         assert response["session_id"] == client.get_session_id()
 
     @staticmethod
-    def test_session_continuity() -> None:
+    def test_session_continuity(bedrock_client: BedrockAgentClient) -> None:
         """Test that sessions maintain context across multiple messages."""
-        agent_id, agent_alias_id, region = TestIntegration.get_agent_config()
-
-        client = BedrockAgentClient(agent_id, agent_alias_id, region)
-        session_id = client.get_session_id()
+        client = bedrock_client
+        session_id = client.new_session()
 
         # Send first message
         response1 = client.invoke_agent("My name is Alice")
@@ -80,11 +56,9 @@ class TestIntegration:
         assert len(response2["completion"]) > 0
 
     @staticmethod
-    def test_new_session_integration() -> None:
+    def test_new_session_integration(bedrock_client: BedrockAgentClient) -> None:
         """Test creating a new session."""
-        agent_id, agent_alias_id, region = TestIntegration.get_agent_config()
-
-        client = BedrockAgentClient(agent_id, agent_alias_id, region)
+        client = bedrock_client
         original_session = client.get_session_id()
 
         # Create new session
@@ -94,13 +68,12 @@ class TestIntegration:
         assert client.get_session_id() == new_session
 
     @staticmethod
-    def test_end_to_end_with_logging() -> None:
+    def test_end_to_end_with_logging(bedrock_client: BedrockAgentClient) -> None:
         """Test complete flow with client and logger."""
-        agent_id, agent_alias_id, region = TestIntegration.get_agent_config()
-
         with tempfile.TemporaryDirectory() as tmpdir:
-            # Create client and logger
-            client = BedrockAgentClient(agent_id, agent_alias_id, region)
+            # Start a fresh conversation and logger
+            client = bedrock_client
+            client.new_session()
             logger = ChatHistoryLogger(tmpdir, client.get_session_id())
 
             # Send a message